@@ -31,15 +31,46 @@ Output schema additions:
 - trade.gross_cost            : sum of buy fills (price * count)
 - trade.sell_proceeds         : sum of sell fills (price * count)
 - trade.net_contracts         : contracts still held into settlement
+- trades_list / open_trades   : indices into all_trades (each trade is
+                                serialized once; index.html dereferences)
 """
 
 import os
 import json
 import time
+import sqlite3
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timezone, timedelta
-from collections import defaultdict
-import kalshi_python
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+
+# Kalshi's basic API tier allows 20 read requests per second. Market lookups
+# fan out across a small thread pool and share one limiter so we stay under it.
+MAX_READS_PER_SECOND = 20
+MARKET_FETCH_WORKERS = 8
+
+# Page size for the cursor-paginated portfolio endpoints (fills,
+# settlements): the API maximum, so each sequential round trip returns as
+# many records as possible.
+PORTFOLIO_PAGE_LIMIT = 200
+
+# (connect, read) timeouts in seconds: fail fast on a dead connection, but
+# give a slow response room, so one stuck socket can't hang the job.
+REQUEST_TIMEOUT = (5, 15)
+
+# GET /markets accepts a comma-separated `tickers` filter, so metadata is
+# pulled this many markets per request instead of one request per ticker.
+MARKET_BATCH_SIZE = 100
+
+# Market metadata is cached on disk between runs (the workflow persists
+# .cache/ with actions/cache). Settled markets never change, so they are
+# reused forever; anything still live is refetched once it is an hour old.
+MARKET_CACHE_PATH = os.path.join('.cache', 'markets.sqlite')
+OPEN_MARKET_TTL = 3600  # seconds
 
 
 # ---------------------------------------------------------------------------
@@ -118,11 +149,13 @@ BET_TYPE_PATTERNS = [
 OUTRIGHT_SPORTS = {'Golf', 'Tennis', 'NASCAR', 'Formula 1', 'UFC/MMA'}
 
 
+@lru_cache(maxsize=4096)
 def parse_ticker(ticker):
     """Returns (sport, bet_type) inferred from a Kalshi ticker.
 
     Falls back to ('Other', 'Other') for tickers we don't recognize so the
-    caller never has to handle None.
+    caller never has to handle None. Memoized: yes and no positions on the
+    same market share a ticker.
     """
     if not ticker:
         return ('Other', 'Other')
@@ -182,26 +215,47 @@ def parse_ticker(ticker):
 # Datetime helpers
 # ---------------------------------------------------------------------------
 
+def _normalize_iso(s):
+    """Rewrites 'Z' and pads/truncates fractional seconds to 6 digits."""
+    s = s.replace('Z', '+00:00')
+    if '.' in s:
+        dot_idx = s.index('.')
+        end_idx = dot_idx + 1
+        while end_idx < len(s) and s[end_idx].isdigit():
+            end_idx += 1
+        frac = s[dot_idx + 1:end_idx]
+        frac_normalized = frac[:6].ljust(6, '0')
+        s = s[:dot_idx + 1] + frac_normalized + s[end_idx:]
+    return s
+
+
 def parse_date(created_time):
     """Robust ISO datetime parser. Handles Kalshi's variable-length microseconds."""
     if not created_time:
         return None
+    s = str(created_time)
     try:
-        s = str(created_time).replace('Z', '+00:00')
-        if '.' in s:
-            dot_idx = s.index('.')
-            end_idx = dot_idx + 1
-            while end_idx < len(s) and s[end_idx].isdigit():
-                end_idx += 1
-            frac = s[dot_idx + 1:end_idx]
-            frac_normalized = frac[:6].ljust(6, '0')
-            s = s[:dot_idx + 1] + frac_normalized + s[end_idx:]
+        # Fast path: Python 3.11+ parses 'Z' and any fractional-second
+        # precision natively (in C), so normalizing is only a fallback.
         dt = datetime.fromisoformat(s)
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
-        return dt
-    except Exception:
-        return None
+    except ValueError:
+        try:
+            dt = datetime.fromisoformat(_normalize_iso(s))
+        except Exception:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+@lru_cache(maxsize=None)
+def month_labels(year, month):
+    """(display, sort key) for a calendar month, e.g. ('Nov 2024', '2024-11').
+
+    Cached: there are only a handful of distinct months per run.
+    """
+    first = datetime(year, month, 1)
+    return (first.strftime('%b %Y'), first.strftime('%Y-%m'))
 
 
 # ---------------------------------------------------------------------------
@@ -260,31 +314,68 @@ def fill_action(fill):
 # Settlement classification
 # ---------------------------------------------------------------------------
 
-def classify_position(market, side, net_contracts):
+# Market status / result vocabularies (lowercased) used to classify positions.
+OPEN_STATUSES = frozenset({'initialized', 'active', 'open', 'unopened'})
+SETTLED_STATUSES = frozenset({'closed', 'settled', 'finalized', 'determined'})
+VOID_RESULTS = frozenset({
+    'void', 'no_contest', 'no contest', 'unresolved', 'cancelled', 'canceled',
+})
+
+# Position outcomes that count toward settled (headline) numbers.
+SETTLED_OUTCOMES = frozenset({'won', 'lost', 'void'})
+
+
+def market_outcome(market):
+    """Reduce a market payload to the lowercased (status, result) pair.
+
+    Done once per ticker so classify_position doesn't re-normalize the same
+    market for every position on it. Returns None for a failed lookup.
+    """
+    if not market:
+        return None
+    return (
+        (market.get('status') or '').lower(),
+        (market.get('result') or '').lower(),
+    )
+
+
+def settlement_outcome(settlement):
+    """(status, result) for a /portfolio/settlements record.
+
+    Returns None when the settlement alone can't classify the position
+    (e.g. scalar markets); those fall back to a market lookup.
+    """
+    result = (settlement.get('market_result') or '').lower()
+    if result in ('yes', 'no') or result in VOID_RESULTS:
+        return ('settled', result)
+    return None
+
+
+def classify_position(outcome, side, net_contracts):
     """
     Decide settlement status of the contracts STILL HELD at settlement.
+    `outcome` is the market's (status, result) pair from market_outcome().
     Returns (status, payout) where:
       status  in {'won','lost','open','void','unknown'}
       payout  is the $ value of the winning contracts (Kalshi pays $1 each)
 
     Only applied to the net contracts remaining after sells.
     """
-    if not market:
+    if not outcome:
         return ('unknown', 0.0)
 
-    status = (market.get('status') or '').lower()
-    result = (market.get('result') or '').lower()
+    status, result = outcome
 
     # Open / pre-settlement
-    if status in ('initialized', 'active', 'open', 'unopened'):
+    if status in OPEN_STATUSES:
         return ('open', 0.0)
 
     # Voided / no contest — capital is refunded
-    if result in ('void', 'no_contest', 'no contest', 'unresolved', 'cancelled', 'canceled'):
+    if result in VOID_RESULTS:
         return ('void', 0.0)
 
     # Settled with a clear outcome
-    if status in ('closed', 'settled', 'finalized', 'determined'):
+    if status in SETTLED_STATUSES:
         if not result:
             # Settled but no result string — treat as void (refund) rather than
             # silently dropping cost into the loss column.
@@ -296,6 +387,144 @@ def classify_position(market, side, net_contracts):
     return ('unknown', 0.0)
 
 
+# ---------------------------------------------------------------------------
+# On-disk market cache
+# ---------------------------------------------------------------------------
+
+def _connect_market_cache(path):
+    conn = sqlite3.connect(path)
+    conn.execute(
+        'CREATE TABLE IF NOT EXISTS markets ('
+        ' ticker TEXT PRIMARY KEY, status TEXT, result TEXT,'
+        ' payload TEXT, fetched_at REAL)'
+    )
+    # Touch every column we use so a corrupt file or an old schema fails
+    # here rather than midway through the run.
+    conn.execute(
+        'SELECT ticker, status, result, payload, fetched_at FROM markets LIMIT 1'
+    ).fetchall()
+    return conn
+
+
+def open_market_cache(path=MARKET_CACHE_PATH):
+    """Open (creating if needed) the SQLite market cache.
+
+    The cache is only an optimization: an unreadable file is discarded and
+    rebuilt instead of failing the run (a failed job would otherwise restore
+    the same bad file from actions/cache every time).
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    try:
+        return _connect_market_cache(path)
+    except sqlite3.DatabaseError as e:
+        print(f"  Warning: market cache {path} unreadable ({e}); rebuilding it")
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return _connect_market_cache(path)
+
+
+def _is_final(status, result):
+    """True once a market has settled with a result that can't change."""
+    return (status or '').lower() in SETTLED_STATUSES and bool(result)
+
+
+def load_cached_markets(conn, tickers, now):
+    """Return {ticker: market} for tickers whose cached row is still valid."""
+    hits = {}
+    try:
+        rows = conn.execute(
+            'SELECT ticker, status, result, payload, fetched_at FROM markets'
+        ).fetchall()
+    except sqlite3.DatabaseError as e:
+        print(f"  Warning: could not read market cache ({e}); refetching all")
+        return hits
+    for ticker, status, result, payload, fetched_at in rows:
+        if ticker not in tickers:
+            continue
+        if _is_final(status, result) or fetched_at > now - OPEN_MARKET_TTL:
+            hits[ticker] = json.loads(payload)
+    return hits
+
+
+def store_markets(conn, markets, now):
+    """Upsert freshly fetched markets; failed lookups (None) are skipped."""
+    rows = [
+        (ticker, m.get('status'), m.get('result'), json.dumps(m), now)
+        for ticker, m in markets.items()
+        if m is not None
+    ]
+    try:
+        with conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO markets'
+                ' (ticker, status, result, payload, fetched_at)'
+                ' VALUES (?, ?, ?, ?, ?)',
+                rows,
+            )
+    except sqlite3.DatabaseError as e:
+        print(f"  Warning: could not update market cache ({e})")
+
+
+# ---------------------------------------------------------------------------
+# Rate limiting
+# ---------------------------------------------------------------------------
+
+class RateLimiter:
+    """Adaptive sliding-window limiter that is safe to share between threads.
+
+    acquire() blocks until fewer than `rate` calls have been made in the last
+    `period` seconds, so bursts run at full speed and only the excess waits.
+    record() adapts the rate AIMD-style: it halves whenever the API throttles
+    us and climbs back by `step` per unthrottled call, up to max_calls.
+    """
+
+    def __init__(self, max_calls, period=1.0, min_calls=1, step=0.5):
+        self.max_calls = max_calls
+        self.min_calls = min_calls
+        self.step = step
+        self.rate = max_calls
+        self.period = period
+        self._calls = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0] >= self.period:
+                    self._calls.popleft()
+                if len(self._calls) < self.rate:
+                    self._calls.append(now)
+                    return
+                wait = self.period - (now - self._calls[0])
+            time.sleep(wait)
+
+    def record(self, throttled):
+        with self._lock:
+            if throttled:
+                self.rate = max(self.min_calls, self.rate / 2)
+            else:
+                self.rate = min(self.max_calls, self.rate + self.step)
+
+
+def was_throttled(response):
+    """True if the API pushed back on this request.
+
+    That is a 429 on the response or on any retry urllib3 made to get it, or
+    an X-RateLimit-Remaining header saying the budget is spent, so the
+    limiter slows down before the next call gets rejected.
+    """
+    if response.status_code == 429:
+        return True
+    remaining = response.headers.get('X-RateLimit-Remaining', '')
+    if remaining.isdigit() and int(remaining) == 0:
+        return True
+    retries = getattr(response.raw, 'retries', None)
+    return bool(retries) and any(h.status == 429 for h in retries.history)
+
+
 # ---------------------------------------------------------------------------
 # Main fetcher
 # ---------------------------------------------------------------------------
@@ -310,7 +539,10 @@ def fetch_and_save_data():
     print("Connecting to Kalshi API...")
 
     # We rely on raw requests + manual signing; the SDK is configured only so
-    # that future code (e.g. order placement) could share the client.
+    # that future code (e.g. order placement) could share the client. It is
+    # imported here rather than at module level because it takes ~0.5 s to
+    # import and nothing else in this module needs it.
+    import kalshi_python
     config = kalshi_python.Configuration()
     config.host = 'https://api.elections.kalshi.com/trade-api/v2'
     config.api_key_id = api_key_id
@@ -318,26 +550,46 @@ def fetch_and_save_data():
     _ = kalshi_python.KalshiClient(config)  # noqa: F841 — kept for parity
     print("Connected!")
 
+    limiter = RateLimiter(MAX_READS_PER_SECOND)
+
+    # One keep-alive session for every call so each request reuses a pooled
+    # TLS connection instead of paying a fresh handshake. The pool holds one
+    # connection per market worker. Rate-limit and gateway errors are retried
+    # with backoff (honoring Retry-After) before a lookup is given up on.
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=MARKET_FETCH_WORKERS,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=(429, 502, 503, 504),
+            raise_on_status=False,
+        ),
+    ))
+
     import base64
     from cryptography.hazmat.primitives import hashes, serialization
     from cryptography.hazmat.primitives.asymmetric import padding
     from cryptography.hazmat.backends import default_backend
 
+    # Parse the PEM and build the PSS parameters once; every request used to
+    # re-parse the key before signing. The key object is safe to share
+    # across the worker threads.
+    signing_key = serialization.load_pem_private_key(
+        private_key.encode(), password=None, backend=default_backend()
+    )
+    pss = padding.PSS(
+        mgf=padding.MGF1(hashes.SHA256()),
+        salt_length=padding.PSS.DIGEST_LENGTH,
+    )
+    sha256 = hashes.SHA256()
+
     def sign_request(method, path):
         timestamp_ms = str(int(time.time() * 1000))
         path_no_query = path.split('?')[0]
         msg = (timestamp_ms + method + path_no_query).encode('utf-8')
-        key = serialization.load_pem_private_key(
-            private_key.encode(), password=None, backend=default_backend()
-        )
-        sig = key.sign(
-            msg,
-            padding.PSS(
-                mgf=padding.MGF1(hashes.SHA256()),
-                salt_length=padding.PSS.DIGEST_LENGTH,
-            ),
-            hashes.SHA256(),
-        )
+        sig = signing_key.sign(msg, pss, sha256)
         return {
             'Content-Type': 'application/json',
             'KALSHI-ACCESS-KEY': api_key_id,
@@ -345,14 +597,21 @@ def fetch_and_save_data():
             'KALSHI-ACCESS-SIGNATURE': base64.b64encode(sig).decode(),
         }
 
+    def signed_get(url, path):
+        """Rate-limited signed GET; reports throttling back to the limiter."""
+        limiter.acquire()
+        r = session.get(url, headers=sign_request('GET', path), timeout=REQUEST_TIMEOUT)
+        limiter.record(was_throttled(r))
+        return r
+
     def get_raw_fills(cursor=None):
         path = '/trade-api/v2/portfolio/fills'
-        params = 'limit=100'
+        params = f'limit={PORTFOLIO_PAGE_LIMIT}'
         if cursor:
             params += f'&cursor={cursor}'
         url = f'https://api.elections.kalshi.com{path}?{params}'
         try:
-            r = requests.get(url, headers=sign_request('GET', path), timeout=15)
+            r = signed_get(url, path)
             if r.status_code == 200:
                 data = r.json()
                 return data.get('fills', []), data.get('cursor')
@@ -362,11 +621,28 @@ def fetch_and_save_data():
             print(f"  Request error fetching fills: {e}")
             return [], None
 
+    def get_raw_settlements(cursor=None):
+        path = '/trade-api/v2/portfolio/settlements'
+        params = f'limit={PORTFOLIO_PAGE_LIMIT}'
+        if cursor:
+            params += f'&cursor={cursor}'
+        url = f'https://api.elections.kalshi.com{path}?{params}'
+        try:
+            r = signed_get(url, path)
+            if r.status_code == 200:
+                data = r.json()
+                return data.get('settlements', []), data.get('cursor')
+            print(f"  HTTP {r.status_code} fetching settlements: {r.text[:200]}")
+            return [], None
+        except Exception as e:
+            print(f"  Request error fetching settlements: {e}")
+            return [], None
+
     def get_raw_market(ticker):
         path = f'/trade-api/v2/markets/{ticker}'
         url = f'https://api.elections.kalshi.com{path}'
         try:
-            r = requests.get(url, headers=sign_request('GET', path), timeout=15)
+            r = signed_get(url, path)
             if r.status_code == 200:
                 return r.json().get('market', {})
             print(f"    HTTP {r.status_code} for {ticker}")
@@ -375,26 +651,25 @@ def fetch_and_save_data():
             print(f"    Request error for {ticker}: {e}")
             return None
 
-    # --- 1. Pull every fill, paginate until cursor is None --------------
-    all_fills = []
-    cursor = None
-    page = 1
-    max_pages = 200  # safety cap; 200 * 100 = 20k fills
-    while page <= max_pages:
-        print(f"  Fetching fills page {page}...")
-        fills, next_cursor = get_raw_fills(cursor)
-        if fills:
-            all_fills.extend(fills)
-        # Keep going only if Kalshi explicitly returned another cursor.
-        if not next_cursor:
-            break
-        cursor = next_cursor
-        page += 1
-    print(f"Pulled {len(all_fills)} raw fills across {page} page(s)")
+    def get_raw_markets(tickers):
+        """Batch lookup via the list endpoint. Returns {ticker: market}."""
+        path = '/trade-api/v2/markets'
+        params = f"tickers={','.join(tickers)}&limit={len(tickers)}"
+        url = f'https://api.elections.kalshi.com{path}?{params}'
+        try:
+            r = signed_get(url, path)
+            if r.status_code == 200:
+                return {m['ticker']: m for m in r.json().get('markets', [])}
+            print(f"    HTTP {r.status_code} for batch of {len(tickers)} markets")
+            return {}
+        except Exception as e:
+            print(f"    Request error for batch of {len(tickers)} markets: {e}")
+            return {}
 
-    # --- 2. Group fills into positions keyed by (ticker, side) ----------
+    # --- 1. Pull every fill and group into positions ---------------------
     # A "position" is the user's entire exposure to one side of one market,
-    # regardless of how many partial fills it took to build.
+    # regardless of how many partial fills it took to build. Positions are
+    # keyed by (ticker, side).
     positions = defaultdict(lambda: {
         'ticker': None,
         'side': None,
@@ -409,11 +684,11 @@ def fetch_and_save_data():
         'last_fill': None,    # latest created_time
     })
 
-    for fill in all_fills:
+    def add_fill(fill):
         ticker = _f(fill, 'ticker') or _f(fill, 'market_ticker') or ''
         side = (_f(fill, 'side') or 'yes').lower()
         if not ticker:
-            continue
+            return
 
         key = (ticker, side)
         pos = positions[key]
@@ -443,19 +718,102 @@ def fetch_and_save_data():
             if pos['last_fill'] is None or ft > pos['last_fill']:
                 pos['last_fill'] = ft
 
+    max_pages = 200  # safety cap; 200 pages * 200 = 40k fills
+
+    def get_settled_outcomes():
+        """{ticker: (status, result)} for every market held to settlement."""
+        outcomes = {}
+        cursor = None
+        seen_cursors = set()
+        for _ in range(max_pages):
+            settlements, cursor = get_raw_settlements(cursor)
+            for st in settlements:
+                outcome = settlement_outcome(st)
+                if st.get('ticker') and outcome:
+                    outcomes[st['ticker']] = outcome
+            if not cursor or cursor in seen_cursors:
+                break
+            seen_cursors.add(cursor)
+        return outcomes
+
+    # Pages are chained by cursor, so they can't be fetched in parallel, but
+    # the next page is requested as soon as its cursor arrives and downloads
+    # while the current page is being grouped. The settlements feed is an
+    # independent cursor chain, so it paginates alongside on its own worker.
+    raw_fills = 0
+    page = 1
+    seen_cursors = set()
+    with ThreadPoolExecutor(max_workers=2) as prefetch:
+        settlements_future = prefetch.submit(get_settled_outcomes)
+        print(f"  Fetching fills page {page}...")
+        pending = prefetch.submit(get_raw_fills, None)
+        while True:
+            fills, next_cursor = pending.result()
+            # Keep going only if Kalshi explicitly returned another cursor,
+            # and stop if it ever hands back one we've already followed.
+            more = (
+                bool(next_cursor)
+                and next_cursor not in seen_cursors
+                and page < max_pages
+            )
+            if more:
+                seen_cursors.add(next_cursor)
+                page += 1
+                print(f"  Fetching fills page {page}...")
+                pending = prefetch.submit(get_raw_fills, next_cursor)
+            raw_fills += len(fills)
+            for fill in fills:
+                add_fill(fill)
+            if not more:
+                break
+    print(f"Pulled {raw_fills} raw fills across {page} page(s)")
     print(f"Grouped into {len(positions)} positions")
 
-    # --- 3. Look up each unique market once ------------------------------
-    market_cache = {}
-    unique_tickers = {p['ticker'] for p in positions.values()}
-    for i, ticker in enumerate(sorted(unique_tickers)):
-        if (i + 1) % 20 == 0:
-            print(f"  market lookup {i + 1}/{len(unique_tickers)}")
-        market_cache[ticker] = get_raw_market(ticker)
-        time.sleep(0.05)
+    # --- 3. Resolve each unique market once ----------------------------
+    # Markets we held into settlement are resolved straight from the
+    # paginated /portfolio/settlements feed. Of the rest, markets that have
+    # settled come from the on-disk cache, and anything else is pulled in
+    # batches from the list endpoint, concurrently; the shared limiter (not
+    # a per-call sleep) keeps us under the rate cap.
+    settled_outcomes = settlements_future.result()
+    unique_tickers = {p['ticker'] for p in positions.values()} - settled_outcomes.keys()
+    print(f"Markets: {len(settled_outcomes)} resolved from settlements")
+    cache_db = open_market_cache()
+    fetched_at = time.time()
+    market_cache = load_cached_markets(cache_db, unique_tickers, fetched_at)
+    to_fetch = sorted(unique_tickers - market_cache.keys())
+    print(f"Markets: {len(market_cache)} cached, {len(to_fetch)} to fetch")
+
+    fetched = {}
+    batches = [
+        to_fetch[i:i + MARKET_BATCH_SIZE]
+        for i in range(0, len(to_fetch), MARKET_BATCH_SIZE)
+    ]
+    with ThreadPoolExecutor(max_workers=MARKET_FETCH_WORKERS) as pool:
+        for found in pool.map(get_raw_markets, batches):
+            fetched.update(found)
+        # Anything the list endpoint didn't return (e.g. multivariate combo
+        # markets) falls back to a single-market lookup.
+        missing = [t for t in to_fetch if t not in fetched]
+        if missing:
+            print(f"  {len(missing)} market(s) not in batch results, fetching individually")
+        futures = {pool.submit(get_raw_market, t): t for t in missing}
+        for i, future in enumerate(as_completed(futures)):
+            if (i + 1) % 20 == 0:
+                print(f"  market lookup {i + 1}/{len(missing)}")
+            fetched[futures[future]] = future.result()
+    store_markets(cache_db, fetched, fetched_at)
+    cache_db.close()
+    market_cache.update(fetched)
+    market_outcomes = {t: market_outcome(m) for t, m in market_cache.items()}
+    market_outcomes.update(settled_outcomes)
 
     # --- 4. Resolve each position into a denormalized trade record ------
+    # Recent 7 days uses each position's first fill timestamp; it is checked
+    # here against the parsed datetime instead of re-parsing trade_date.
+    seven_days_ago = datetime.now(timezone.utc) - timedelta(days=7)
     trades = []
+    recent_ids = set()
     for (ticker, side), pos in positions.items():
         net_contracts = pos['buy_count'] - pos['sell_count']
         # Floating-point safety: contracts should be integers; treat tiny
@@ -463,13 +821,13 @@ def fetch_and_save_data():
         if abs(net_contracts) < 1e-6:
             net_contracts = 0.0
 
-        market = market_cache.get(ticker)
+        outcome = market_outcomes.get(ticker)
 
         # Realized proceeds from any sells already happened.
         realized_proceeds = pos['sell_proceeds']
 
         if net_contracts > 0:
-            status, settle_payout = classify_position(market, side, net_contracts)
+            status, settle_payout = classify_position(outcome, side, net_contracts)
         else:
             # User fully exited before settlement — purely realized P/L.
             settle_payout = 0.0
@@ -498,8 +856,12 @@ def fetch_and_save_data():
         weighted_buy_price = (gross_cost / pos['buy_count']) if pos['buy_count'] else 0.0
         first_fill = pos['first_fill'] or pos['last_fill']
         trade_date_iso = first_fill.isoformat() if first_fill else None
+        if first_fill:
+            month, month_sort = month_labels(first_fill.year, first_fill.month)
+        else:
+            month, month_sort = 'Unknown', 'Unknown'
 
-        trades.append({
+        trade = {
             'ticker': ticker,
             'side': side,
             'sport': pos['sport'],
@@ -515,19 +877,27 @@ def fetch_and_save_data():
             'net_contracts': round(net_contracts, 4),
             'outcome_status': status,
             'trade_date': trade_date_iso,
-            'month': first_fill.strftime('%b %Y') if first_fill else 'Unknown',
-            'month_sort': first_fill.strftime('%Y-%m') if first_fill else 'Unknown',
-        })
+            'month': month,
+            'month_sort': month_sort,
+        }
+        trades.append(trade)
+        if first_fill and first_fill >= seven_days_ago:
+            recent_ids.add(id(trade))
 
     # --- 5. Aggregate ----------------------------------------------------
     def summarize(items):
-        won = sum(1 for t in items if t['outcome_status'] == 'won')
-        lost = sum(1 for t in items if t['outcome_status'] == 'lost')
-        open_ = sum(1 for t in items if t['outcome_status'] == 'open')
-        void = sum(1 for t in items if t['outcome_status'] == 'void')
-        cost = sum(t['cost'] for t in items)
-        profit = sum(t['profit'] for t in items)
-        payout = sum(t['payout'] for t in items)
+        # One pass per bucket rather than a separate scan for every field.
+        counts = {'won': 0, 'lost': 0, 'open': 0, 'void': 0}
+        cost = profit = payout = 0
+        for t in items:
+            status = t['outcome_status']
+            if status in counts:
+                counts[status] += 1
+            cost += t['cost']
+            profit += t['profit']
+            payout += t['payout']
+        won, lost = counts['won'], counts['lost']
+        open_, void = counts['open'], counts['void']
         win_rate = (won / (won + lost) * 100) if (won + lost) > 0 else 0.0
         roi = (profit / cost * 100) if cost > 0 else 0.0
         avg = (cost / len(items)) if items else 0.0
@@ -545,30 +915,49 @@ def fetch_and_save_data():
             'avg_bet': round(avg, 2),
         }
 
-    settled_trades = [t for t in trades if t['outcome_status'] in ('won', 'lost', 'void')]
-    open_trades = [t for t in trades if t['outcome_status'] == 'open']
-    open_exposure = round(sum(t['cost'] for t in open_trades), 2)
+    # Sort once, newest first. trades_list / open_trades hold indices into
+    # this all_trades array instead of copies of each record, so every trade
+    # is serialized exactly once; index.html resolves them back on load.
+    all_sorted = sorted(trades, key=lambda x: x.get('trade_date') or '', reverse=True)
+    trade_index = {id(t): i for i, t in enumerate(all_sorted)}
 
-    overall = summarize(trades)
-    settled = summarize(settled_trades)
+    def trade_refs(items):
+        return [trade_index[id(t)] for t in items]
 
+    # Single pass over every trade to fill all the buckets the summaries
+    # below are built from. Walking the sorted list means every bucket comes
+    # out newest-first without sorting it again.
+    settled_trades = []
+    open_trades = []
+    open_exposure = 0
+    recent = []
     by_sport = defaultdict(list)
     by_bet_type = defaultdict(list)
     by_month = defaultdict(list)
-    for t in trades:
+    for t in all_sorted:
+        status = t['outcome_status']
+        if status in SETTLED_OUTCOMES:
+            settled_trades.append(t)
+        elif status == 'open':
+            open_trades.append(t)
+            open_exposure += t['cost']
         by_sport[t['sport']].append(t)
         by_bet_type[t['bet_type']].append(t)
         if t['month_sort'] != 'Unknown':
             by_month[t['month_sort']].append(t)
+        if id(t) in recent_ids:
+            recent.append(t)
+    open_exposure = round(open_exposure, 2)
+
+    overall = summarize(trades)
+    settled = summarize(settled_trades)
 
     def stats_for_groups(groups, key_label):
         out = []
         for label, items in groups.items():
             s = summarize(items)
             s[key_label] = label
-            s['trades_list'] = sorted(
-                items, key=lambda x: x.get('trade_date') or '', reverse=True
-            )
+            s['trades_list'] = trade_refs(items)
             out.append(s)
         # Sort by net profit descending — keeps "doing best" at the top.
         out.sort(key=lambda x: x['profit'], reverse=True)
@@ -583,22 +972,11 @@ def fetch_and_save_data():
         s = summarize(items)
         s['month_sort'] = ms
         s['month'] = items[0].get('month', ms) if items else ms
-        s['trades_list'] = sorted(
-            items, key=lambda x: x.get('trade_date') or '', reverse=True
-        )
+        s['trades_list'] = trade_refs(items)
         month_stats.append(s)
 
-    # Recent 7 days uses each position's first fill timestamp.
-    seven_days_ago = datetime.now(timezone.utc) - timedelta(days=7)
-    recent = []
-    for t in trades:
-        td = parse_date(t.get('trade_date'))
-        if td and td >= seven_days_ago:
-            recent.append(t)
     recent_summary = summarize(recent)
-    recent_summary['trades_list'] = sorted(
-        recent, key=lambda x: x.get('trade_date') or '', reverse=True
-    )[:20]
+    recent_summary['trades_list'] = trade_refs(recent)[:20]
 
     now_utc = datetime.now(timezone.utc)
     summary = {
@@ -624,24 +1002,23 @@ def fetch_and_save_data():
         'fees_note': 'Trading fees are not yet subtracted from P/L.',
     }
 
-    all_sorted = sorted(trades, key=lambda x: x.get('trade_date') or '', reverse=True)
-
     data = {
         'generated_at': now_utc.isoformat(),
         'generated_at_display': now_utc.strftime('%B %d, %Y at %I:%M %p UTC'),
         'summary': summary,
         'recent_7_days': recent_summary,
-        'open_trades': sorted(
-            open_trades, key=lambda x: x.get('trade_date') or '', reverse=True
-        ),
+        'open_trades': trade_refs(open_trades),
         'by_sport': sport_stats,
         'by_bet_type': bet_type_stats,
         'by_month': month_stats,
         'all_trades': all_sorted,
     }
 
+    # Compact separators: indentation roughly doubled the file and the time
+    # spent encoding it. Hosts gzip data.json on the wire, so it stays a
+    # plain .json that index.html can fetch directly.
     with open('data.json', 'w') as f:
-        json.dump(data, f, indent=2, default=str)
+        json.dump(data, f, separators=(',', ':'), default=str)
 
     print(
         f"\nDone! "